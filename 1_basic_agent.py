@@ -5,12 +5,20 @@ Interactive chat demonstrating how to build agents with @tool decorated function
 """
 
 import asyncio
+from functools import lru_cache, wraps
+import operator
+import time
 import httpx
+import orjson
+from cachetools import TTLCache
 from datetime import datetime
 from langchain_aws import ChatBedrockConverse
 from langgraph.prebuilt import create_react_agent
 from langchain_core.tools import tool
+from langchain_core.globals import set_llm_cache
 import boto3
+from agent_utils import async_input, message_text, print_tool_usage, sorted_tools, stream_agent_response
+from cache import create_llm_cache
 import os
 
 # Constants
@@ -31,8 +39,61 @@ US_CITIES = {
     "Denver": (39.7392, -104.9903)
 }
 
+# calculate() operations: name -> (function, display symbol)
+_OPS = {
+    "add": (operator.add, "+"),
+    "subtract": (operator.sub, "-"),
+    "multiply": (operator.mul, "×"),
+    "divide": (operator.truediv, "÷")
+}
+
+# City facts for get_city_info
+_CITY_INFO = {
+    "New York": "Population: ~8.3M, Known for: Times Square, Statue of Liberty",
+    "Los Angeles": "Population: ~3.9M, Known for: Hollywood, Beaches",
+    "Chicago": "Population: ~2.7M, Known for: Deep dish pizza, Architecture",
+    "Houston": "Population: ~2.3M, Known for: Space Center, Oil industry",
+    "Phoenix": "Population: ~1.6M, Known for: Desert, Sunshine",
+    "Philadelphia": "Population: ~1.6M, Known for: Liberty Bell, Cheesesteaks",
+    "San Antonio": "Population: ~1.5M, Known for: The Alamo, River Walk",
+    "San Diego": "Population: ~1.4M, Known for: Zoo, Perfect weather",
+    "Dallas": "Population: ~1.3M, Known for: Cowboys, BBQ",
+    "Denver": "Population: ~715K, Known for: Mountains, Mile high city"
+}
+
+# Precomputed "available cities" lists for the not-found replies
+_US_CITIES_KEYS_STR = ", ".join(US_CITIES)
+_CITY_INFO_KEYS_STR = ", ".join(_CITY_INFO)
+
+# Lowercased lookups (name -> (canonical name, value)) so "new york" matches "New York"
+_US_CITIES_LC = {name.lower(): (name, coords) for name, coords in US_CITIES.items()}
+_CITY_INFO_LC = {name.lower(): (name, info) for name, info in _CITY_INFO.items()}
+
+# Shared NWS client so keep-alive connections are reused across tool calls
+_NWS_CLIENT = httpx.AsyncClient(
+    headers={
+        "User-Agent": USER_AGENT,
+        "Accept": "application/geo+json"
+    },
+    timeout=30.0,
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+)
+
+# Forecasts keyed by (lat, lon, hour) - NWS refreshes forecasts roughly hourly
+_weather_cache = TTLCache(maxsize=128, ttl=3600)
+
+# points -> forecast URL mapping is stable per coordinate, so keep it for the process lifetime
+_forecast_urls: dict[tuple[float, float], str] = {}
+# In-progress points lookups, so a query joins the background prefetch instead of repeating it
+_forecast_url_tasks: dict[tuple[float, float], asyncio.Task] = {}
+
+# Cache LLM responses (Redis or SQLite) so repeated prompts skip the Bedrock round-trip, even across runs
+set_llm_cache(create_llm_cache())
+
+@lru_cache(maxsize=1)
 def create_bedrock_client():
-    """Create a Bedrock client."""
+    """Create the Bedrock client once per process and reuse it."""
     bedrock_client = boto3.client(
         service_name='bedrock-runtime',
         region_name=os.getenv('AWS_REGION'),
@@ -41,38 +102,80 @@ def create_bedrock_client():
     )
     return bedrock_client
 
-async def make_nws_request(url: str) -> dict | None:
+async def make_nws_request(url: str, log_errors: bool = True) -> dict | None:
     """Make a request to the NWS API with proper error handling."""
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/geo+json"
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
+    try:
+        response = await _NWS_CLIENT.get(url)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    except Exception as e:
+        if log_errors:
             print(f"Error making NWS request: {e}")
-            return None
+        return None
+
+async def _resolve_forecast_url(lat: float, lon: float, log_errors: bool) -> str | None:
+    """Look up the NWS forecast URL for a coordinate and remember it."""
+    points_data = await make_nws_request(f"{NWS_API_BASE}/points/{lat},{lon}", log_errors)
+    forecast_url = (points_data or {}).get("properties", {}).get("forecast")
+    if forecast_url:
+        _forecast_urls[(lat, lon)] = forecast_url
+    return forecast_url or None
+
+async def _get_forecast_url(lat: float, lon: float, log_errors: bool = True) -> str | None:
+    """Resolve the NWS forecast URL for a coordinate, caching the points lookup."""
+    forecast_url = _forecast_urls.get((lat, lon))
+    if forecast_url is not None:
+        return forecast_url
+    
+    key = (lat, lon)
+    task = _forecast_url_tasks.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_resolve_forecast_url(lat, lon, log_errors))
+        _forecast_url_tasks[key] = task
+        task.add_done_callback(lambda _: _forecast_url_tasks.pop(key, None))
+    # Shield so cancelling the prefetch on exit doesn't cancel a lookup a query is waiting on
+    return await asyncio.shield(task)
+
+async def prefetch_forecast_urls():
+    """Resolve the forecast URL for every city concurrently, so weather queries need one request."""
+    # Quiet and best-effort: the weather tool retries and reports any city that fails here
+    await asyncio.gather(
+        *(_get_forecast_url(lat, lon, log_errors=False) for lat, lon in US_CITIES.values()),
+        return_exceptions=True
+    )
+
+def _run_inline(sync_tool):
+    """Give a non-blocking sync @tool a coroutine so ainvoke() skips the thread pool hop."""
+    func = sync_tool.func
+
+    @wraps(func)
+    async def coroutine(*args, **kwargs):
+        return func(*args, **kwargs)
+
+    sync_tool.coroutine = coroutine
+    return sync_tool
 
 @tool
 async def get_city_weather(city_name: str) -> str:
     """Get current weather forecast for a US city."""
-    if city_name not in US_CITIES:
-        return f"City '{city_name}' not found. Available cities: {', '.join(US_CITIES.keys())}"
+    entry = _US_CITIES_LC.get(city_name.strip().lower())
+    if entry is None:
+        return f"City '{city_name}' not found. Available cities: {_US_CITIES_KEYS_STR}"
     
-    lat, lon = US_CITIES[city_name]
+    city_name, (lat, lon) = entry
+    
+    # Serve repeat queries within the same hour from cache; a hit returns before any await
+    cache_key = (lat, lon, int(time.time() // 3600))
+    cached = _weather_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
     # First get the forecast grid endpoint
-    points_url = f"{NWS_API_BASE}/points/{lat},{lon}"
-    points_data = await make_nws_request(points_url)
+    forecast_url = await _get_forecast_url(lat, lon)
     
-    if not points_data:
+    if not forecast_url:
         return f"Unable to fetch forecast data for {city_name}."
     
-    # Get the forecast URL from the points response
-    forecast_url = points_data["properties"]["forecast"]
     forecast_data = await make_nws_request(forecast_url)
     
     if not forecast_data:
@@ -85,52 +188,34 @@ async def get_city_weather(city_name: str) -> str:
         forecast = f"  {period['name']}: {period['temperature']}°{period['temperatureUnit']} - {period['shortForecast']}"
         forecasts.append(forecast)
     
-    return f"{city_name} Weather Forecast:\\n" + "\\n".join(forecasts)
+    result = f"{city_name} Weather Forecast:\\n" + "\\n".join(forecasts)
+    _weather_cache[cache_key] = result
+    return result
 
+@_run_inline
 @tool
 def calculate(a: float, b: float, operation: str) -> str:
     """Perform mathematical calculations. Operations: add, subtract, multiply, divide"""
     try:
-        if operation.lower() == "add":
-            result = a + b
-            return f"{a} + {b} = {result}"
-        elif operation.lower() == "subtract":
-            result = a - b
-            return f"{a} - {b} = {result}"
-        elif operation.lower() == "multiply":
-            result = a * b
-            return f"{a} × {b} = {result}"
-        elif operation.lower() == "divide":
-            if b == 0:
-                return "Error: Cannot divide by zero"
-            result = a / b
-            return f"{a} ÷ {b} = {result}"
-        else:
+        op = _OPS.get(operation.lower())
+        if op is None:
             return f"Unknown operation: {operation}. Use: add, subtract, multiply, divide"
+        fn, symbol = op
+        if fn is operator.truediv and b == 0:
+            return "Error: Cannot divide by zero"
+        return f"{a} {symbol} {b} = {fn(a, b)}"
     except Exception as e:
         return f"Error calculating: {e}"
 
+@_run_inline
 @tool
 def get_city_info(city_name: str) -> str:
     """Get basic information about major US cities."""
-    city_info = {
-        "New York": "Population: ~8.3M, Known for: Times Square, Statue of Liberty",
-        "Los Angeles": "Population: ~3.9M, Known for: Hollywood, Beaches", 
-        "Chicago": "Population: ~2.7M, Known for: Deep dish pizza, Architecture",
-        "Houston": "Population: ~2.3M, Known for: Space Center, Oil industry",
-        "Phoenix": "Population: ~1.6M, Known for: Desert, Sunshine",
-        "Philadelphia": "Population: ~1.6M, Known for: Liberty Bell, Cheesesteaks",
-        "San Antonio": "Population: ~1.5M, Known for: The Alamo, River Walk",
-        "San Diego": "Population: ~1.4M, Known for: Zoo, Perfect weather",
-        "Dallas": "Population: ~1.3M, Known for: Cowboys, BBQ",
-        "Denver": "Population: ~715K, Known for: Mountains, Mile high city"
-    }
-    
-    if city_name in city_info:
-        return f"{city_name}: {city_info[city_name]}"
-    else:
-        available = ", ".join(city_info.keys())
-        return f"City '{city_name}' not found. Available cities: {available}"
+    entry = _CITY_INFO_LC.get(city_name.strip().lower())
+    if entry:
+        name, info = entry
+        return f"{name}: {info}"
+    return f"City '{city_name}' not found. Available cities: {_CITY_INFO_KEYS_STR}"
 
 def create_llm():
     """Create LLM with error handling."""
@@ -166,7 +251,7 @@ async def interactive_agent_with_tools():
         return
     
     # Create tools list - demonstrating @tool decorator usage
-    tools = [get_city_weather, calculate, get_city_info]
+    tools = sorted_tools([get_city_weather, calculate, get_city_info])
     
     # Create ReAct agent with tools
     agent = create_react_agent(llm, tools)
@@ -177,7 +262,7 @@ async def interactive_agent_with_tools():
     while True:
         try:
             # Get user input
-            user_input = input("You: ").strip()
+            user_input = (await async_input("You: ")).strip()
             
             if user_input.lower() in ['quit', 'exit', 'bye', 'q', 'goodbye']:
                 print("👋 Goodbye!")
@@ -189,7 +274,8 @@ async def interactive_agent_with_tools():
             # Process with agent
             print("🤖 Agent: ", end="", flush=True)
             
-            response = await agent.ainvoke({
+            # Stream the reply token by token
+            response = await stream_agent_response(agent, {
                 "messages": [{
                     "role": "user", 
                     "content": user_input
@@ -198,26 +284,14 @@ async def interactive_agent_with_tools():
             
             # Show tool usage if any
             if 'messages' in response and len(response['messages']) > 1:
-                for msg in response['messages'][1:-1]:  # Skip user input and final response
-                    if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                        for tool_call in msg.tool_calls:
-                            print(f"🔧 Using @tool: {tool_call['name']}")
-                    elif hasattr(msg, 'name') and msg.name:
-                        print(f"🔧 Used @tool: {msg.name}")
-            
-            # Extract and print the response
-            if 'messages' in response and response['messages']:
-                last_message = response['messages'][-1]
-                if hasattr(last_message, 'content'):
-                    print(last_message.content)
-                else:
-                    print(str(last_message))
-            else:
+                print_tool_usage(response['messages'], "@tool")
+            elif not response.get('messages'):
                 print("No response generated")
             
             print()  # Add blank line
             
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            # Ctrl+C cancels the running task while input or the agent is awaited
             print("\\n👋 Goodbye!")
             break
         except Exception as e:
@@ -233,7 +307,7 @@ async def demo_mode():
     if not llm:
         return
     
-    tools = [get_city_weather, calculate, get_city_info]
+    tools = sorted_tools([get_city_weather, calculate, get_city_info])
     agent = create_react_agent(llm, tools)
     
     # Demo queries showcasing different @tool functions
@@ -254,14 +328,11 @@ async def demo_mode():
             
             # Show tool usage
             if 'messages' in response and len(response['messages']) > 1:
-                for msg in response['messages'][1:-1]:
-                    if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                        for tool_call in msg.tool_calls:
-                            print(f"🔧 @tool used: {tool_call['name']}")
+                print_tool_usage(response['messages'], "@tool")
             
             # Show response
             if 'messages' in response and response['messages']:
-                result = response['messages'][-1].content
+                result = message_text(response['messages'][-1])
                 print(f"🤖 Response: {result[:200]}{'...' if len(result) > 200 else ''}")
             else:
                 print("❌ No response generated")
@@ -271,10 +342,20 @@ async def demo_mode():
         
         print("-" * 40)
 
+async def main(run):
+    """Run a demo entry point, then close the shared NWS client."""
+    # Resolve forecast URLs in the background so the banner and first prompt aren't held up
+    prefetch = asyncio.create_task(prefetch_forecast_urls())
+    try:
+        await run()
+    finally:
+        prefetch.cancel()
+        await _NWS_CLIENT.aclose()
+
 if __name__ == "__main__":
     import sys
     
     if len(sys.argv) > 1 and sys.argv[1] == "--demo":
-        asyncio.run(demo_mode())
+        asyncio.run(main(demo_mode))
     else:
-        asyncio.run(interactive_agent_with_tools())
\ No newline at end of file
+        asyncio.run(main(interactive_agent_with_tools))
\ No newline at end of file
@@ -5,14 +5,37 @@ Interactive Terminal Agent with Math and Weather MCP Tools
 """
 
 import asyncio
+from functools import lru_cache
 import os
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.prebuilt import create_react_agent
 from langchain_aws import ChatBedrockConverse
+from langchain_core.globals import set_llm_cache
 import boto3
+from agent_utils import print_tool_usage, sorted_tools, stream_agent_response
+from cache import create_llm_cache
 
+# MCP servers run as long-lived HTTP services (start them first, see README):
+#   python math_server.py --transport streamable-http --port 6000
+#   python weather_server.py --transport streamable-http --port 6001
+# Each session then reuses a keep-alive connection instead of spawning a Python subprocess.
+MCP_CONFIG = {
+    "math": {
+        "transport": "streamable_http",
+        "url": os.getenv("MATH_MCP_URL", "http://127.0.0.1:6000/mcp")
+    },
+    "weather": {
+        "transport": "streamable_http",
+        "url": os.getenv("WEATHER_MCP_URL", "http://127.0.0.1:6001/mcp")
+    }
+}
+
+# Cache LLM responses (Redis or SQLite) so repeated prompts skip the Bedrock round-trip, even across runs
+set_llm_cache(create_llm_cache())
+
+@lru_cache(maxsize=1)
 def create_bedrock_client():
-    """Create a Bedrock client."""
+    """Create the Bedrock client once per process and reuse it."""
     
     bedrock_client = boto3.client(
         service_name='bedrock-runtime',
@@ -56,24 +79,12 @@ async def interactive_chat():
     if not llm:
         return
     
-    # MCP client configuration
-    mcp_config = {
-        "math": {
-            "command": "/path/to/your/.venv/bin/python", # replace with your own path
-            "args": ["/path/to/your/math_server.py"] # replace with your own path
-        },
-        "weather": {
-            "command": "/path/to/your/.venv/bin/python", 
-            "args": ["/path/to/your/weather_server.py"]
-        }
-    }
-    
     try:
-        async with MultiServerMCPClient(mcp_config) as client:
+        async with MultiServerMCPClient(MCP_CONFIG) as client:
             print("🔗 Connected to MCP servers")
             
             # Create agent with tools
-            tools = client.get_tools()
+            tools = sorted_tools(client.get_tools())
             agent = create_react_agent(llm, tools)
             
             print(f"🛠️  Available tools: {[tool.name for tool in tools]}")
@@ -94,7 +105,8 @@ async def interactive_chat():
                     # Process with agent
                     print("🤖 Agent: ", end="", flush=True)
                     
-                    response = await agent.ainvoke({
+                    # Stream the reply token by token
+                    response = await stream_agent_response(agent, {
                         "messages": [{
                             "role": "user", 
                             "content": user_input
@@ -103,21 +115,8 @@ async def interactive_chat():
                     
                     # Show tool usage if any
                     if 'messages' in response and len(response['messages']) > 1:
-                        for msg in response['messages'][1:-1]:  # Skip user input and final response
-                            if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                                for tool_call in msg.tool_calls:
-                                    print(f"\n🔧 Using tool: {tool_call['name']}")
-                            elif hasattr(msg, 'name') and msg.name:
-                                print(f"\n🔧 Used tool: {msg.name}")
-                    
-                    # Extract and print the response
-                    if 'messages' in response and response['messages']:
-                        last_message = response['messages'][-1]
-                        if hasattr(last_message, 'content'):
-                            print(last_message.content)
-                        else:
-                            print(str(last_message))
-                    else:
+                        print_tool_usage(response['messages'])
+                    elif not response.get('messages'):
                         print("No response generated")
                     
                     print()  # Add blank line
@@ -137,20 +136,9 @@ def quick_test():
     print("🧪 Quick Test Mode")
     
     async def test():
-        mcp_config = {
-            "math": {
-                "command": "/path/to/your/.venv/bin/python", # replace with your own path
-                "args": ["/path/to/your/server.py"] # replace with your own path
-            },
-            "weather": {
-                "command": "/path/to/your/.venv/bin/python", # replace with your own path
-                "args": ["/path/to/your/weather_server.py"] # replace with your own path
-            }
-        }
-        
         try:
-            async with MultiServerMCPClient(mcp_config) as client:
-                tools = client.get_tools()
+            async with MultiServerMCPClient(MCP_CONFIG) as client:
+                tools = sorted_tools(client.get_tools())
                 print(f"✅ Connected! Available tools: {[tool.name for tool in tools]}")
                 
                 # Test math tool directly
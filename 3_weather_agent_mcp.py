@@ -5,11 +5,17 @@ Uses ReAct agent with MCP connection to weather_server.py for weather reports
 """
 
 import asyncio
+import hashlib
+from functools import lru_cache
 from datetime import datetime
+from diskcache import Cache
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.prebuilt import create_react_agent
 from langchain_aws import ChatBedrockConverse
+from langchain_core.globals import set_llm_cache
 import boto3
+from agent_utils import message_text, sorted_tools, stream_agent_response
+from cache import create_llm_cache
 import os
 
 # US Cities for reports
@@ -18,8 +24,49 @@ US_CITIES = [
     "Philadelphia", "San Antonio", "San Diego", "Dallas", "Denver"
 ]
 
+# Prompts for the 10-city report
+PREFETCHED_REPORT_PROMPT = """Generate a comprehensive weather report for these major US cities: {cities_list}.
+
+The forecasts below were already fetched with the get_city_weather tool:
+
+{forecasts}
+
+Please:
+1. Present the information in a clear, organized format with each city's weather clearly separated
+2. Include temperature, conditions, and forecast details
+3. Only call get_city_weather again for a city whose fetch failed
+
+Format the output as a clean summary with clear headings for each city."""
+
+REPORT_PROMPT = """Generate a comprehensive weather report for these major US cities: {cities_list}.
+
+For each city, please:
+1. Use the get_city_weather tool to get the weather forecast
+2. Present the information in a clear, organized format with each city's weather clearly separated
+3. Include temperature, conditions, and forecast details
+
+Use the available MCP weather tools to get the most current information for each city.
+Format the output as a clean summary with clear headings for each city."""
+
+# MCP weather server runs as a long-lived HTTP service (start it first, see README):
+#   python weather_server.py --transport streamable-http --port 6001
+MCP_CONFIG = {
+    "weather": {
+        "transport": "streamable_http",
+        "url": os.getenv("WEATHER_MCP_URL", "http://127.0.0.1:6001/mcp")
+    }
+}
+
+# Finished reports and per-city tool outputs from earlier runs, shared across processes
+_plan_cache = Cache("./.agent_cache")
+PLAN_CACHE_TTL = 3600  # NWS forecasts refresh roughly hourly
+
+# Cache LLM responses (Redis or SQLite) so repeated prompts skip the Bedrock round-trip, even across runs
+set_llm_cache(create_llm_cache())
+
+@lru_cache(maxsize=1)
 def create_bedrock_client():
-    """Create a Bedrock client."""
+    """Create the Bedrock client once per process and reuse it."""
     bedrock_client = boto3.client(
         service_name='bedrock-runtime',
         region_name=os.getenv('AWS_REGION'),
@@ -37,10 +84,63 @@ def append_to_weather_summary(report: str, title: str = "MCP Weather Report"):
         f.write("=" * 50 + "\n")
         f.write(report + "\n")
 
+def _report_cache_key() -> str:
+    """Key the finished report on the prompts and city list that produce it."""
+    source = PREFETCHED_REPORT_PROMPT + REPORT_PROMPT + str(sorted(US_CITIES))
+    return "report:" + hashlib.sha256(source.encode()).hexdigest()
+
+def print_report_header():
+    """Print the banner that opens a report."""
+    print("\n" + "="*60)
+    print("MCP WEATHER REPORT - 10 US CITIES")
+    print("="*60)
+
+def print_report(report: str):
+    """Print a finished report between banners."""
+    print_report_header()
+    print(report)
+    print("="*60)
+
+def _fetch_succeeded(output: str) -> bool:
+    """Whether a prefetched city output holds a forecast rather than an error."""
+    return not output.startswith(("Error", "Fetch failed"))
+
+async def prefetch_city_weather(weather_tool) -> dict[str, str]:
+    """Fetch weather for all US_CITIES concurrently, reusing city results cached within the hour."""
+    outputs = {city: _plan_cache.get(f"city:{city}") for city in US_CITIES}
+    missing = [city for city, output in outputs.items() if output is None]
+    
+    results = await asyncio.gather(
+        *(weather_tool.ainvoke({"city_name": city}) for city in missing),
+        return_exceptions=True
+    )
+    
+    for city, result in zip(missing, results):
+        if isinstance(result, Exception):
+            outputs[city] = f"Fetch failed: {result}"
+            continue
+        outputs[city] = result
+        if _fetch_succeeded(result):
+            _plan_cache.set(f"city:{city}", result, expire=PLAN_CACHE_TTL)
+    return outputs
+
+def format_city_forecasts(outputs: dict[str, str]) -> str:
+    """Format per-city tool outputs as markdown sections."""
+    return "\n\n".join(f"### {city}\n{output}" for city, output in outputs.items())
+
 async def generate_mcp_weather_report():
     """Generate weather reports for 10 US cities using MCP weather server."""
     print("🌤️  Generating MCP Weather Reports...")
     
+    # Skip the whole agent run when the same report was generated within the hour
+    report_key = _report_cache_key()
+    cached = _plan_cache.get(report_key)
+    if cached:
+        print(f"♻️  Reusing report generated at {cached['timestamp']}")
+        print_report(cached['report'])
+        # Already appended to weather_summary.txt, under its own timestamp, when it was generated
+        return
+    
     # Create LLM
     try:
         bedrock_client = create_bedrock_client()
@@ -55,54 +155,53 @@ async def generate_mcp_weather_report():
         print(f"❌ Failed to setup LLM: {e}")
         return
     
-    # MCP client configuration
-    mcp_config = {
-        "weather": {
-            "command": "/path/to/your/.venv/bin/python", # replace with your own path
-            "args": ["/path/to/your/weather_server.py"] # replace with your own path
-        }
-    }
-    
     try:
         # Connect to MCP weather server
         print("🔗 Connecting to MCP weather server...")
-        async with MultiServerMCPClient(mcp_config) as client:
+        async with MultiServerMCPClient(MCP_CONFIG) as client:
             print("✅ Connected to MCP server")
             
             # Get available tools
-            tools = client.get_tools()
+            tools = sorted_tools(client.get_tools())
             print(f"🛠️  Available MCP tools: {[tool.name for tool in tools]}")
             
             # Create ReAct agent with MCP tools
             agent = create_react_agent(llm, tools)
             
-            # Generate comprehensive report for all cities
+            # Fetch every city concurrently up front instead of one tool call per agent turn
+            weather_tool = next((tool for tool in tools if tool.name == "get_city_weather"), None)
             cities_list = ", ".join(US_CITIES)
-            prompt = f"""Generate a comprehensive weather report for these major US cities: {cities_list}.
-
-For each city, please:
-1. Use the get_city_weather tool to get the weather forecast
-2. Present the information in a clear, organized format with each city's weather clearly separated
-3. Include temperature, conditions, and forecast details
-
-Use the available MCP weather tools to get the most current information for each city.
-Format the output as a clean summary with clear headings for each city."""
+            tool_outputs = {}
+            if weather_tool:
+                print("⚡ Fetching weather for all cities concurrently...")
+                tool_outputs = await prefetch_city_weather(weather_tool)
+                prompt = PREFETCHED_REPORT_PROMPT.format(
+                    cities_list=cities_list,
+                    forecasts=format_city_forecasts(tool_outputs)
+                )
+            else:
+                prompt = REPORT_PROMPT.format(cities_list=cities_list)
             
             print("🔧 Running MCP agent to generate reports...")
-            response = await agent.ainvoke({
+            print_report_header()
+            
+            # Stream the report as it is written
+            response = await stream_agent_response(agent, {
                 "messages": [{"role": "user", "content": prompt}]
             })
             
             # Extract the response
             if 'messages' in response and response['messages']:
-                report = response['messages'][-1].content
-                
-                print("\n" + "="*60)
-                print("MCP WEATHER REPORT - 10 US CITIES")
-                print("="*60)
-                print(report)
+                report = message_text(response['messages'][-1])
                 print("="*60)
                 
+                # Only replay reports built from a full set of forecasts, so failed cities are retried
+                if tool_outputs and all(_fetch_succeeded(output) for output in tool_outputs.values()):
+                    _plan_cache.set(report_key, {
+                        "report": report,
+                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M")
+                    }, expire=PLAN_CACHE_TTL)
+                
                 # Append to summary file
                 append_to_weather_summary(report, "MCP 10-City Weather")
                 print(f"\n✅ MCP report appended to weather_summary.txt")
@@ -117,16 +216,9 @@ async def test_individual_city():
     """Test getting weather for a single city using MCP."""
     print("\n🧪 Testing individual city weather via MCP...")
     
-    mcp_config = {
-        "weather": {
-            "command": "/path/to/your/.venv/bin/python", # replace with your own path
-            "args": ["/path/to/your/weather_server.py"] # replace with your own path
-        }
-    }
-    
     try:
-        async with MultiServerMCPClient(mcp_config) as client:
-            tools = client.get_tools()
+        async with MultiServerMCPClient(MCP_CONFIG) as client:
+            tools = sorted_tools(client.get_tools())
             
             # Test direct tool call
             for tool in tools:
@@ -0,0 +1,83 @@
+"""
+Shared helpers for the agent demos
+Streaming output, message formatting and tool-usage display used by demos 1-3
+"""
+
+import asyncio
+import sys
+import threading
+from langchain_core.messages import AIMessage, ToolMessage
+
+def message_text(message) -> str:
+    """Get the text of a message or stream chunk (Bedrock may return a list of content blocks)."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+
+    parts = []
+    for block in content:
+        if isinstance(block, str):
+            parts.append(block)
+        elif block.get("type") == "text":
+            parts.append(block.get("text", ""))
+    return "".join(parts)
+
+async def async_input(prompt: str) -> str:
+    """input() that leaves the event loop free for background work while the user types."""
+    print(prompt, end="", flush=True)
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(method, value):
+        if not future.done():  # The awaiting task may have been cancelled by Ctrl+C
+            method(value)
+
+    def read():
+        # Unbuffered reads take no io lock, so a read abandoned on this daemon thread
+        # can't block or abort interpreter shutdown (asyncio.to_thread would block exit)
+        line = sys.stdin.buffer.raw.readline()
+        if line:
+            outcome = (future.set_result, line.decode(sys.stdin.encoding, "replace").rstrip("\r\n"))
+        else:
+            outcome = (future.set_exception, EOFError())
+        try:
+            loop.call_soon_threadsafe(settle, *outcome)
+        except RuntimeError:
+            pass  # Loop already closed
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+def sorted_tools(tools: list) -> list:
+    """Sort tools by name so the tool schemas in the prompt prefix, and LLM cache keys, are stable across runs."""
+    return sorted(tools, key=lambda t: t.name)
+
+async def stream_agent_response(agent, inputs: dict) -> dict:
+    """Print the agent's tokens as they arrive and return its final state."""
+    response = {}
+    streamed = False  # Whether the latest model call printed any text
+    async for event in agent.astream_events(inputs, version="v2"):
+        if event["event"] == "on_chat_model_start":
+            streamed = False
+        elif event["event"] == "on_chat_model_stream":
+            text = message_text(event["data"]["chunk"])
+            if text:
+                streamed = True
+                print(text, end="", flush=True)
+        elif event["event"] == "on_chain_end" and not event["parent_ids"]:
+            # The root run's output is the agent's final state
+            response = event["data"]["output"]
+    # LLM cache hits return without streaming, so print the final reply directly
+    if not streamed and response.get("messages"):
+        print(message_text(response["messages"][-1]), end="")
+    print()
+    return response
+
+def print_tool_usage(messages: list, label: str = "tool"):
+    """Print the tools called between the user input and the final response."""
+    for msg in messages[1:-1]:  # Skip user input and final response
+        if isinstance(msg, AIMessage):
+            for tool_call in msg.tool_calls:
+                print(f"🔧 Using {label}: {tool_call['name']}")
+        elif isinstance(msg, ToolMessage) and msg.name:
+            print(f"🔧 Used {label}: {msg.name}")
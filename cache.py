@@ -0,0 +1,129 @@
+"""
+Persistent LLM response caches for the agent demos
+Keeps Bedrock responses across runs so repeated prompts skip the LLM call
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import warnings
+from contextlib import closing
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+# Defaults
+DEFAULT_TTL = 86400  # 24 hours
+DEFAULT_SQLITE_PATH = ".langchain.db"
+
+def _normalize_prompt(prompt: str) -> str:
+    """Drop message ids from a serialized chat prompt.
+
+    LangGraph gives every message a fresh UUID, so without this two identical
+    conversations never share a key.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt  # Plain-text LLM prompt
+    if not isinstance(messages, list):
+        return prompt
+    for message in messages:
+        if isinstance(message, dict) and isinstance(message.get("kwargs"), dict):
+            message["kwargs"].pop("id", None)
+    return json.dumps(messages)
+
+def _cache_key(prompt: str, llm_string: str) -> str:
+    """Build a stable cache key (hash() is salted per process, so use sha256)."""
+    digest = hashlib.sha256((_normalize_prompt(prompt) + llm_string).encode("utf-8")).hexdigest()
+    return f"llm_cache:{digest}"
+
+def _dump_generations(return_val: RETURN_VAL_TYPE) -> str:
+    """Serialize generations, keeping ChatGeneration/AIMessage types intact."""
+    return json.dumps([dumps(gen) for gen in return_val])
+
+def _load_generations(payload: str | bytes) -> RETURN_VAL_TYPE:
+    """Deserialize generations stored by _dump_generations."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", LangChainBetaWarning)
+        return [loads(gen) for gen in json.loads(payload)]
+
+class RedisCache(BaseCache):
+    """LLM cache backed by Redis, shared across processes and hosts."""
+
+    def __init__(self, redis_url: str, ttl: int = DEFAULT_TTL):
+        import redis
+
+        self.redis = redis.from_url(redis_url)
+        self.ttl = ttl
+        self._redis_error = redis.RedisError
+
+    # An unreachable Redis counts as a miss / no-op so it never breaks an LLM call
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        try:
+            cached = self.redis.get(_cache_key(prompt, llm_string))
+        except self._redis_error:
+            return None
+        if cached is None:
+            return None
+        return _load_generations(cached)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        try:
+            self.redis.set(_cache_key(prompt, llm_string), _dump_generations(return_val), ex=self.ttl)
+        except self._redis_error:
+            pass
+
+    def clear(self, **kwargs) -> None:
+        for key in self.redis.scan_iter("llm_cache:*"):
+            self.redis.delete(key)
+
+class SQLiteCache(BaseCache):
+    """LLM cache backed by a local SQLite file, for single-host dev runs."""
+
+    def __init__(self, database_path: str = DEFAULT_SQLITE_PATH, ttl: int = DEFAULT_TTL):
+        self.database_path = database_path
+        self.ttl = ttl
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # Async LLM calls run lookups in executor threads, so connect per operation
+        return sqlite3.connect(self.database_path)
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND created_at > ?",
+                (_cache_key(prompt, llm_string), time.time() - self.ttl)
+            ).fetchone()
+        if row is None:
+            return None
+        return _load_generations(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            # Evict expired rows on write so the file doesn't grow without bound
+            conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl,))
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (_cache_key(prompt, llm_string), _dump_generations(return_val), now)
+            )
+
+    def clear(self, **kwargs) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM llm_cache")
+
+def create_llm_cache() -> BaseCache:
+    """Create the LLM cache: Redis when REDIS_URL is set, otherwise a local SQLite file."""
+    redis_url = os.getenv("REDIS_URL")
+    ttl = int(os.getenv("LLM_CACHE_TTL", DEFAULT_TTL))
+    if redis_url:
+        return RedisCache(redis_url, ttl=ttl)
+    return SQLiteCache(os.getenv("LLM_CACHE_PATH", DEFAULT_SQLITE_PATH), ttl=ttl)
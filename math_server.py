@@ -5,6 +5,7 @@ Provides mathematical calculation tools via MCP protocol using FastMCP.
 """
 
 import argparse
+import numpy as np
 from fastmcp import FastMCP
 
 # Initialize FastMCP server
@@ -52,12 +53,12 @@ def calculate_average(numbers: str) -> float:
     """Calculate average of comma-separated numbers"""
     try:
         # Parse comma-separated numbers
-        num_list = [float(x.strip()) for x in numbers.split(',')]
-        if not num_list:
+        values = np.array(numbers.split(','), dtype=np.float64)
+        if values.size == 0:
             return "Error: No numbers provided"
         
-        average = sum(num_list) / len(num_list)
-        print(f"🧮 Average of {num_list} = {average}")
+        average = float(values.mean())
+        print(f"🧮 Average of {values.size} numbers = {average}")
         return average
     except ValueError:
         return "Error: Invalid number format. Use comma-separated numbers like '1,2,3,4'"
@@ -0,0 +1,57 @@
+"""Tests for the LLM response caches in cache.py"""
+
+from langchain_core.globals import set_llm_cache
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.prebuilt import create_react_agent
+from pydantic import PrivateAttr
+import pytest
+
+from cache import RedisCache, SQLiteCache
+
+class CountingChatModel(BaseChatModel):
+    """Chat model that always answers "hello" and counts how often it is called."""
+
+    _calls: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._calls += 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="hello"))])
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+@pytest.fixture
+def sqlite_cache(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "llm_cache.db"))
+    set_llm_cache(cache)
+    yield cache
+    set_llm_cache(None)
+
+def test_identical_agent_invocations_call_model_once(sqlite_cache):
+    model = CountingChatModel()
+    agent = create_react_agent(model, [])
+
+    for _ in range(2):
+        # Each invocation gets fresh message ids from LangGraph
+        response = agent.invoke({"messages": [{"role": "user", "content": "hi"}]})
+        assert response["messages"][-1].content == "hello"
+
+    assert model._calls == 1
+
+def test_sqlite_cache_ignores_expired_entries(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "llm_cache.db"), ttl=0)
+    cache.update("prompt", "llm", [ChatGeneration(message=AIMessage(content="hello"))])
+
+    assert cache.lookup("prompt", "llm") is None
+
+def test_redis_cache_treats_unreachable_server_as_miss():
+    cache = RedisCache("redis://127.0.0.1:1/0")  # Nothing listens on port 1
+    cache.update("prompt", "llm", [ChatGeneration(message=AIMessage(content="hello"))])
+
+    assert cache.lookup("prompt", "llm") is None
@@ -0,0 +1,125 @@
+"""Tests for the NWS fetch, parse and cache paths in weather_server.py"""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+import weather_server
+
+POINTS = {
+    "properties": {
+        "forecast": "https://api.weather.gov/gridpoints/BOU/62,60/forecast",
+        "gridId": "BOU",
+        "gridX": 62,
+        "gridY": 60,
+        "observationStations": "https://api.weather.gov/gridpoints/BOU/62,60/stations",
+        "relativeLocation": {"type": "Feature"}
+    }
+}
+
+def _period(number: int) -> dict:
+    return {
+        "number": number,
+        "name": f"Period {number}",
+        "temperature": 50 + number,
+        "temperatureUnit": "F",
+        "probabilityOfPrecipitation": {"name": "nested", "value": 10},
+        "shortForecast": "Sunny",
+        "detailedForecast": "Sunny all day."
+    }
+
+FORECAST = {"properties": {"periods": [_period(number) for number in range(14)]}}
+
+@pytest.fixture
+def nws(monkeypatch):
+    """Route NWS requests to canned bodies; returns (routes, requested paths)."""
+    routes = {}
+    requested = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        await asyncio.sleep(0)  # Let concurrent callers pile up on the in-flight fetch
+        for prefix, body in routes.items():
+            if request.url.path.startswith(prefix):
+                return httpx.Response(200, content=body if isinstance(body, bytes) else orjson.dumps(body))
+        return httpx.Response(404)
+
+    monkeypatch.setattr(weather_server, "CLIENT", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    for cache in (
+        weather_server._points_cache, weather_server._forecast_cache, weather_server._obs_cache,
+        weather_server._alerts_cache, weather_server._station_cache, weather_server._city_grids,
+        weather_server._inflight
+    ):
+        cache.clear()
+    return routes, requested
+
+def test_forecast_renders_only_the_first_periods(nws):
+    routes, _ = nws
+    routes["/points/"] = POINTS
+    routes["/gridpoints/"] = FORECAST
+
+    result = asyncio.run(weather_server.get_weather_forecast(39.7392, -104.9903, "Denver"))
+
+    assert "Weather Office: BOU, Grid: (62, 60)" in result
+    assert "Period 4: 54°F" in result
+    assert "Period 5" not in result
+    periods = weather_server._forecast_cache[POINTS["properties"]["forecast"]]
+    assert len(periods) == weather_server.MAX_PERIODS
+    # Nested keys that share a field name (probabilityOfPrecipitation.name) are not picked up
+    assert periods[0] == {
+        "name": "Period 0",
+        "temperature": 50,
+        "temperatureUnit": "F",
+        "shortForecast": "Sunny",
+        "detailedForecast": "Sunny all day."
+    }
+
+def test_points_decode_into_structs(nws):
+    routes, _ = nws
+    routes["/points/"] = POINTS
+
+    points = asyncio.run(weather_server._get_points(39.7392, -104.9903))
+
+    assert isinstance(points, weather_server.Points)
+    assert points.properties.gridId == "BOU"
+
+@pytest.mark.parametrize("points, forecast", [
+    (POINTS | {"properties": {"forecast": "https://api.weather.gov/gridpoints/BOU/62,60/forecast"}}, FORECAST),
+    (b"<html>Down for maintenance</html>", FORECAST),
+    (POINTS, b'{"properties": {"periods": [{"name": "Tonig'),
+], ids=["missing-field", "non-json-points", "truncated-forecast"])
+def test_malformed_responses_are_reported_as_parse_errors(nws, points, forecast):
+    routes, _ = nws
+    routes["/points/"] = points
+    routes["/gridpoints/"] = forecast
+
+    result = asyncio.run(weather_server.get_weather_forecast(39.7392, -104.9903, "Denver"))
+
+    assert result.startswith("Error parsing weather data")
+
+def test_concurrent_identical_requests_share_one_fetch(nws):
+    routes, requested = nws
+    routes["/alerts/"] = {"features": []}
+
+    async def ask_five_times():
+        return await asyncio.gather(*(weather_server.get_weather_alerts(40.7128, -74.0060, "NY") for _ in range(5)))
+
+    results = asyncio.run(ask_five_times())
+
+    assert results == ["No active weather alerts for NY"] * 5
+    assert requested == ["/alerts/active"]
+    assert not weather_server._inflight
+
+def test_empty_alerts_are_cached_longer_than_active_alerts(nws):
+    routes, requested = nws
+    routes["/alerts/"] = {"features": []}
+
+    asyncio.run(weather_server.get_weather_alerts(40.7128, -74.0060, "NY"))
+    asyncio.run(weather_server.get_weather_alerts(40.7128, -74.0060, "NY"))
+
+    assert requested == ["/alerts/active"]
+    assert weather_server._alerts_ttu(None, [], 0) == weather_server.NO_ALERTS_TTL
+    assert weather_server._alerts_ttu(None, [{"properties": {}}], 0) == weather_server.ALERTS_TTL
+    assert weather_server.ALERTS_TTL < weather_server.NO_ALERTS_TTL
@@ -5,111 +5,319 @@ Provides weather forecast and current conditions tools via MCP protocol using Fa
 """
 
 import argparse
-import requests
+import asyncio
+import httpx
+import ijson
+import msgspec
+import orjson
+from itertools import islice
+from types import MappingProxyType
+from cachetools import Cache, TLRUCache, TTLCache
 from fastmcp import FastMCP
 
 # Constants
 NWS_API_BASE = "https://api.weather.gov"
 USER_AGENT = "weather-app/1.0"
 
-# Headers for API requests
-headers = {
-    'User-Agent': USER_AGENT
-}
+# NWS endpoint URL builders, formatted from prebuilt templates
+_POINTS_URL = (NWS_API_BASE + "/points/{},{}").format
+_ALERTS_URL = (NWS_API_BASE + "/alerts/active?point={},{}").format
+
+# Common city coordinates for get_city_weather
+CITIES = MappingProxyType({
+    "san francisco": (37.7749, -122.4194),
+    "new york": (40.7128, -74.0060),
+    "los angeles": (34.0522, -118.2437),
+    "chicago": (41.8781, -87.6298),
+    "houston": (29.7604, -95.3698),
+    "phoenix": (33.4484, -112.0740),
+    "philadelphia": (39.9526, -75.1652),
+    "san antonio": (29.4241, -98.4936),
+    "san diego": (32.7157, -117.1611),
+    "dallas": (32.7767, -96.7970),
+    "miami": (25.7617, -80.1918),
+    "atlanta": (33.7490, -84.3880),
+    "boston": (42.3601, -71.0589),
+    "seattle": (47.6062, -122.3321),
+    "denver": (39.7392, -104.9903)
+})
+_CITIES_AVAILABLE = ", ".join(sorted(CITIES))
+
+# Retry transient NWS failures with exponential backoff
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Shared async client; api.weather.gov speaks HTTP/2, so concurrent calls multiplex over one connection
+CLIENT = httpx.AsyncClient(
+    http2=True,
+    headers={
+        'User-Agent': USER_AGENT,
+        'Accept': 'application/geo+json'
+    },
+    timeout=httpx.Timeout(10.0, connect=3.0),
+    limits=httpx.Limits(max_keepalive_connections=16, max_connections=32, keepalive_expiry=60),
+    follow_redirects=True
+)
+
+# How many forecast periods / alerts the tools render
+MAX_PERIODS = 5
+MAX_ALERTS = 5
+# The only forecast period fields get_weather_forecast renders
+PERIOD_FIELDS = ('name', 'temperature', 'temperatureUnit', 'shortForecast', 'detailedForecast')
+
+# Separators for get_weather_alerts output
+ALERTS_HEADER_RULE = "=" * 50
+ALERT_SEPARATOR = "-" * 30
+
+async def _get(url: str) -> httpx.Response:
+    """GET an NWS API URL, retrying 429/5xx responses."""
+    for attempt in range(MAX_RETRIES + 1):
+        response = await CLIENT.get(url)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            break
+        await asyncio.sleep(BACKOFF_FACTOR * 2 ** attempt)
+    response.raise_for_status()
+    return response
+
+async def _fetch_json(url: str) -> dict:
+    """GET a JSON document from the NWS API."""
+    response = await _get(url)
+    return orjson.loads(response.content)
+
+async def _fetch_struct(url: str, struct_type: type[msgspec.Struct]) -> msgspec.Struct:
+    """GET a JSON document and decode it straight into `struct_type`, skipping undeclared fields."""
+    response = await _get(url)
+    return msgspec.json.decode(response.content, type=struct_type)
+
+async def _fetch_items(url: str, prefix: str, limit: int, fields: tuple[str, ...] | None = None) -> list:
+    """GET a JSON document and build objects only for the first `limit` items under `prefix`.
+
+    With `fields`, each item is a dict of just those scalar fields; everything else is skipped unbuilt.
+    """
+    response = await _get(url)
+    if fields is None:
+        return list(islice(ijson.items(response.content, prefix, use_float=True), limit))
+
+    wanted = {f"{prefix}.{field}": field for field in fields}
+    items = []
+    current = {}
+    for path, event, value in ijson.parse(response.content, use_float=True):
+        if path in wanted:
+            current[wanted[path]] = value
+        elif path == prefix and event == 'end_map':
+            items.append(current)
+            current = {}
+            if len(items) == limit:
+                break
+    return items
+
+# Response caches; only successful responses are stored. Tools all run on one event loop,
+# so the caches need no lock. _cached_fetch does await between its cache check and update;
+# _fetch_shared is what keeps concurrent misses for the same URL down to one request.
+_points_cache = TTLCache(maxsize=4096, ttl=86400)  # grid assignment practically never changes
+_forecast_cache = TTLCache(maxsize=1024, ttl=900)
+_obs_cache = TTLCache(maxsize=1024, ttl=300)
+
+# "No alerts" is by far the common answer and can safely be reused a little longer;
+# active alerts expire sooner so hazard updates show up quickly
+ALERTS_TTL = 30
+NO_ALERTS_TTL = 60
+
+def _alerts_ttu(key, features: list, now: float) -> float:
+    """Expiry time for an alerts cache entry."""
+    return now + (ALERTS_TTL if features else NO_ALERTS_TTL)
+
+_alerts_cache = TLRUCache(maxsize=2048, ttu=_alerts_ttu)
+
+# (lat, lon) -> (station_url, station_name); follows from the points data, so it lives as long
+_station_cache = TTLCache(maxsize=4096, ttl=86400)
+
+def _location_key(latitude: float, longitude: float) -> tuple[float, float]:
+    """Normalize coordinates so near-duplicate lookups share a cache entry."""
+    return round(latitude, 4), round(longitude, 4)
+
+# Fetches currently in progress, so concurrent identical requests share one HTTP call.
+# Keyed by URL alone: each endpoint is always fetched with the same fetch function and arguments.
+_inflight: dict[str, asyncio.Task] = {}
+
+async def _fetch_shared(url: str, fetch=_fetch_json, *args):
+    """Run `fetch(url, *args)`, joining an identical fetch already in flight."""
+    task = _inflight.get(url)
+    if task is None:
+        task = asyncio.ensure_future(fetch(url, *args))
+        _inflight[url] = task
+
+        def _done(t: asyncio.Task):
+            _inflight.pop(url, None)
+            # Mark the exception retrieved in case every waiter was cancelled before it finished
+            t.cancelled() or t.exception()
+
+        task.add_done_callback(_done)
+    # Shield so one cancelled caller doesn't cancel the fetch for the others
+    return await asyncio.shield(task)
+
+async def _cached_fetch(cache: Cache, key, url: str, fetch=_fetch_json, *args):
+    """Fetch through a TTL/TLRU cache, coalescing concurrent misses."""
+    data = cache.get(key)
+    if data is None:
+        data = await _fetch_shared(url, fetch, *args)
+        cache[key] = data
+    return data
+
+class PointsProperties(msgspec.Struct, frozen=True):
+    """The parts of an NWS /points response the tools use."""
+    forecast: str
+    gridId: str
+    gridX: int
+    gridY: int
+    observationStations: str
+
+class Points(msgspec.Struct, frozen=True):
+    properties: PointsProperties
+
+async def _get_points(latitude: float, longitude: float) -> Points:
+    """Get the NWS grid metadata for a location."""
+    lat, lon = _location_key(latitude, longitude)
+    return await _cached_fetch(_points_cache, (lat, lon), _POINTS_URL(lat, lon), _fetch_struct, Points)
+
+# Built-in cities' resolved grids (forecast URL, office, x, y). The city list is fixed and NWS grid
+# assignments practically never change, so these are kept for the life of the process.
+_CITY_LOCATIONS = frozenset(_location_key(*coords) for coords in CITIES.values())
+_city_grids: dict[tuple[float, float], tuple[str, str, int, int]] = {}
+
+async def _get_grid(latitude: float, longitude: float) -> tuple[str, str, int, int]:
+    """Get the forecast URL, office and grid x/y for a location."""
+    key = _location_key(latitude, longitude)
+    grid = _city_grids.get(key)
+    if grid is None:
+        props = (await _get_points(latitude, longitude)).properties
+        grid = (props.forecast, props.gridId, props.gridX, props.gridY)
+        if key in _CITY_LOCATIONS:
+            _city_grids[key] = grid
+    return grid
+
+async def _get_forecast_periods(forecast_url: str) -> list:
+    """Get the PERIOD_FIELDS of the first MAX_PERIODS forecast periods for a grid forecast URL."""
+    return await _cached_fetch(
+        _forecast_cache, forecast_url, forecast_url, _fetch_items, "properties.periods.item", MAX_PERIODS, PERIOD_FIELDS
+    )
+
+async def _get_latest_observation(station_url: str) -> dict:
+    """Get the latest observation for a station."""
+    return await _cached_fetch(_obs_cache, station_url, f"{station_url}/observations/latest")
+
+async def _get_alerts(latitude: float, longitude: float) -> list:
+    """Get up to MAX_ALERTS active alerts for a location."""
+    lat, lon = _location_key(latitude, longitude)
+    return await _cached_fetch(
+        _alerts_cache, (lat, lon), _ALERTS_URL(lat, lon), _fetch_items, "features.item", MAX_ALERTS
+    )
+
+async def _get_station(latitude: float, longitude: float, stations_url: str) -> tuple[str, str] | None:
+    """Get the first observation station (URL, name) for a location."""
+    key = _location_key(latitude, longitude)
+    station = _station_cache.get(key)
+    if station is None:
+        stations_data = await _fetch_shared(stations_url)
+        if not stations_data['features']:
+            return None
+        first = stations_data['features'][0]
+        station = _station_cache[key] = (first['id'], first['properties']['name'])
+    return station
+
+async def prefetch_location(latitude: float, longitude: float):
+    """Warm the grid and alerts lookups for a location so follow-up tools skip those round trips."""
+    # Through _get_grid so built-in cities with a resolved grid don't refetch /points.
+    # Failures are left for the tool that actually needs the data to report.
+    await asyncio.gather(_get_grid(latitude, longitude), _get_alerts(latitude, longitude), return_exceptions=True)
+
+# Strong references to fire-and-forget prefetches so they aren't garbage collected mid-flight
+_prefetch_tasks: set[asyncio.Task] = set()
 
 mcp = FastMCP("Weather")
 
 @mcp.tool()
-def get_weather_forecast(latitude: float, longitude: float, location_name: str = "Location") -> str:
+async def get_weather_forecast(latitude: float, longitude: float, location_name: str = "Location") -> str:
     """Get weather forecast for a given location using latitude and longitude"""
     try:
-        # Step 1: Get grid information
-        points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-        response = requests.get(points_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        points_data = response.json()
+        # Step 1: Get grid information (built-in cities skip this after their first lookup)
+        forecast_url, office, grid_x, grid_y = await _get_grid(latitude, longitude)
         
-        # Extract forecast URL
-        forecast_url = points_data['properties']['forecast']
-        office = points_data['properties']['gridId']
-        grid_x = points_data['properties']['gridX']
-        grid_y = points_data['properties']['gridY']
-        
-        # Step 2: Get forecast
-        forecast_response = requests.get(forecast_url, headers=headers, timeout=10)
-        forecast_response.raise_for_status()
-        forecast_data = forecast_response.json()
+        # Step 2: Get forecast (only the periods we show are parsed)
+        periods = await _get_forecast_periods(forecast_url)
         
         # Format forecast
-        periods = forecast_data['properties']['periods']
-        result = f"Weather Forecast for {location_name}\n"
-        result += f"Weather Office: {office}, Grid: ({grid_x}, {grid_y})\n\n"
+        parts = [
+            f"Weather Forecast for {location_name}",
+            f"Weather Office: {office}, Grid: ({grid_x}, {grid_y})",
+            ""
+        ]
         
-        for period in periods[:5]:  # Show first 5 periods
-            result += f"{period['name']}: {period['temperature']}°{period['temperatureUnit']}\n"
-            result += f"  Conditions: {period['shortForecast']}\n"
-            result += f"  Details: {period['detailedForecast'][:150]}...\n\n"
+        for period in periods:
+            name = period['name']
+            temp = period['temperature']
+            unit = period['temperatureUnit']
+            short = period['shortForecast']
+            details = period['detailedForecast'][:150]
+            parts.append(f"{name}: {temp}°{unit}\n  Conditions: {short}\n  Details: {details}...\n")
         
-        return result
+        return "\n".join(parts) + "\n"
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         return f"Error fetching weather data: {e}"
-    except KeyError as e:
+    except (KeyError, msgspec.DecodeError, ijson.JSONError) as e:
         return f"Error parsing weather data: {e}"
 
 @mcp.tool()
-def get_current_conditions(latitude: float, longitude: float, location_name: str = "Location") -> str:
+async def get_current_conditions(latitude: float, longitude: float, location_name: str = "Location") -> str:
     """Get current weather conditions for a given location"""
     try:
         # Get grid information
-        points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-        response = requests.get(points_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        points_data = response.json()
+        points_data = await _get_points(latitude, longitude)
         
         # Get current conditions from stations
-        stations_url = points_data['properties']['observationStations']
-        stations_response = requests.get(stations_url, headers=headers, timeout=10)
-        stations_response.raise_for_status()
-        stations_data = stations_response.json()
+        stations_url = points_data.properties.observationStations
+        station = await _get_station(latitude, longitude, stations_url)
         
-        if stations_data['features']:
+        if station:
             # Get observations from the first station
-            station_url = stations_data['features'][0]['id']
-            obs_url = f"{station_url}/observations/latest"
-            
-            obs_response = requests.get(obs_url, headers=headers, timeout=10)
-            obs_response.raise_for_status()
-            obs_data = obs_response.json()
+            station_url, station_name = station
+            obs_data = await _get_latest_observation(station_url)
             
             props = obs_data['properties']
             
-            result = f"Current Conditions for {location_name}\n"
-            result += f"Station: {stations_data['features'][0]['properties']['name']}\n"
-            result += f"Time: {props.get('timestamp', 'N/A')}\n"
+            parts = [
+                f"Current Conditions for {location_name}",
+                f"Station: {station_name}",
+                f"Time: {props.get('timestamp', 'N/A')}"
+            ]
             
-            # Temperature
-            if props.get('temperature', {}).get('value'):
-                temp_c = props['temperature']['value']
+            # Temperature (NWS reports missing readings as null values)
+            temp_c = (props.get('temperature') or {}).get('value')
+            if temp_c is not None:
                 temp_f = (temp_c * 9/5) + 32
-                result += f"Temperature: {temp_f:.1f}°F ({temp_c:.1f}°C)\n"
+                parts.append(f"Temperature: {temp_f:.1f}°F ({temp_c:.1f}°C)")
             
             # Other conditions
-            if props.get('textDescription'):
-                result += f"Conditions: {props['textDescription']}\n"
+            description = props.get('textDescription')
+            if description:
+                parts.append(f"Conditions: {description}")
             
-            if props.get('windSpeed', {}).get('value'):
-                wind_ms = props['windSpeed']['value']
+            wind_ms = (props.get('windSpeed') or {}).get('value')
+            if wind_ms is not None:
                 wind_mph = wind_ms * 2.237
-                result += f"Wind Speed: {wind_mph:.1f} mph\n"
+                parts.append(f"Wind Speed: {wind_mph:.1f} mph")
             
-            if props.get('windDirection', {}).get('value'):
-                result += f"Wind Direction: {props['windDirection']['value']}°\n"
+            wind_dir = (props.get('windDirection') or {}).get('value')
+            if wind_dir is not None:
+                parts.append(f"Wind Direction: {wind_dir}°")
             
-            if props.get('relativeHumidity', {}).get('value'):
-                result += f"Humidity: {props['relativeHumidity']['value']:.1f}%\n"
+            humidity = (props.get('relativeHumidity') or {}).get('value')
+            if humidity is not None:
+                parts.append(f"Humidity: {humidity:.1f}%")
             
-            return result
+            return "\n".join(parts) + "\n"
         else:
             return f"No observation stations found for {location_name}"
             
@@ -117,72 +325,58 @@ def get_current_conditions(latitude: float, longitude: float, location_name: str
         return f"Error getting current conditions: {e}"
 
 @mcp.tool()
-def get_weather_alerts(latitude: float, longitude: float, location_name: str = "Location") -> str:
+async def get_weather_alerts(latitude: float, longitude: float, location_name: str = "Location") -> str:
     """Get weather alerts for a given location"""
     try:
         # Get alerts for the point
-        alerts_url = f"{NWS_API_BASE}/alerts/active?point={latitude},{longitude}"
-        response = requests.get(alerts_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        alerts_data = response.json()
-        
-        features = alerts_data.get('features', [])
+        features = await _get_alerts(latitude, longitude)
         
         if not features:
             return f"No active weather alerts for {location_name}"
         
-        result = f"Active Weather Alerts for {location_name}\n"
-        result += "=" * 50 + "\n\n"
+        parts = [f"Active Weather Alerts for {location_name}", ALERTS_HEADER_RULE, ""]
         
-        for alert in features[:5]:  # Show up to 5 alerts
+        for alert in features:
             props = alert['properties']
-            result += f"Alert: {props.get('event', 'Unknown')}\n"
-            result += f"Severity: {props.get('severity', 'Unknown')}\n"
-            result += f"Urgency: {props.get('urgency', 'Unknown')}\n"
-            result += f"Areas: {', '.join(props.get('areaDesc', '').split(';')[:3])}\n"
+            parts.append(f"Alert: {props.get('event', 'Unknown')}")
+            parts.append(f"Severity: {props.get('severity', 'Unknown')}")
+            parts.append(f"Urgency: {props.get('urgency', 'Unknown')}")
+            parts.append(f"Areas: {', '.join(props.get('areaDesc', '').split(';')[:3])}")
             
             if props.get('headline'):
-                result += f"Headline: {props['headline']}\n"
+                parts.append(f"Headline: {props['headline']}")
             
             if props.get('description'):
-                result += f"Description: {props['description'][:200]}...\n"
+                parts.append(f"Description: {props['description'][:200]}...")
             
-            result += "\n" + "-" * 30 + "\n\n"
+            parts.extend(["", ALERT_SEPARATOR, ""])
         
-        return result
+        return "\n".join(parts) + "\n"
         
     except Exception as e:
         return f"Error getting weather alerts: {e}"
 
 @mcp.tool()
-def get_city_weather(city_name: str) -> str:
+async def get_city_weather(city_name: str) -> str:
     """Get weather for common US cities by name"""
-    # Common city coordinates
-    cities = {
-        "san francisco": (37.7749, -122.4194),
-        "new york": (40.7128, -74.0060),
-        "los angeles": (34.0522, -118.2437),
-        "chicago": (41.8781, -87.6298),
-        "houston": (29.7604, -95.3698),
-        "phoenix": (33.4484, -112.0740),
-        "philadelphia": (39.9526, -75.1652),
-        "san antonio": (29.4241, -98.4936),
-        "san diego": (32.7157, -117.1611),
-        "dallas": (32.7767, -96.7970),
-        "miami": (25.7617, -80.1918),
-        "atlanta": (33.7490, -84.3880),
-        "boston": (42.3601, -71.0589),
-        "seattle": (47.6062, -122.3321),
-        "denver": (39.7392, -104.9903)
+    coords = CITIES.get(city_name.lower())
+    if coords:
+        # Points requests join the forecast's in-flight fetch; alerts are warmed for follow-up calls
+        task = asyncio.ensure_future(prefetch_location(*coords))
+        _prefetch_tasks.add(task)
+        task.add_done_callback(_prefetch_tasks.discard)
+        return await get_weather_forecast(*coords, city_name.title())
+    return f"City '{city_name}' not found. Available cities: {_CITIES_AVAILABLE}"
+
+@mcp.tool()
+async def get_city_weather_batch(city_names: list[str]) -> dict[str, str]:
+    """Get weather for several common US cities at once, keyed by city name"""
+    # Lookups run concurrently, so N cities take about as long as the slowest one
+    results = await asyncio.gather(*(get_city_weather(name) for name in city_names), return_exceptions=True)
+    return {
+        name: f"Error getting weather for {name}: {result}" if isinstance(result, Exception) else result
+        for name, result in zip(city_names, results)
     }
-    
-    city_lower = city_name.lower()
-    if city_lower in cities:
-        lat, lon = cities[city_lower]
-        return get_weather_forecast(lat, lon, city_name.title())
-    else:
-        available = ", ".join(sorted(cities.keys()))
-        return f"City '{city_name}' not found. Available cities: {available}"
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Weather MCP Server")